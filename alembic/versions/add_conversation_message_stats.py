@@ -0,0 +1,66 @@
+"""Add message_count and last_message_at to conversations
+
+Revision ID: add_conversation_message_stats
+Revises: initial_migration
+Create Date: 2024-04-02 12:00:00.000000
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+# revision identifiers, used by Alembic.
+revision = 'add_conversation_message_stats'
+down_revision = 'initial_migration'
+branch_labels = None
+depends_on = None
+
+def upgrade() -> None:
+    op.add_column('conversations', sa.Column('message_count', sa.Integer(), server_default='0', nullable=False))
+    op.add_column('conversations', sa.Column('last_message_at', sa.DateTime(timezone=True), nullable=True))
+
+    # Backfill existing conversations
+    op.execute("""
+        UPDATE conversations c
+        SET message_count = s.message_count,
+            last_message_at = s.last_message_at
+        FROM (
+            SELECT conversation_id, count(*) AS message_count, max(created_at) AS last_message_at
+            FROM messages
+            GROUP BY conversation_id
+        ) s
+        WHERE c.id = s.conversation_id
+    """)
+
+    # Keep the counters in sync with the messages table
+    op.execute("""
+        CREATE FUNCTION update_conversation_message_stats() RETURNS trigger AS $$
+        BEGIN
+            IF TG_OP = 'INSERT' THEN
+                UPDATE conversations
+                SET message_count = message_count + 1,
+                    last_message_at = GREATEST(last_message_at, NEW.created_at)
+                WHERE id = NEW.conversation_id;
+            ELSIF TG_OP = 'DELETE' THEN
+                UPDATE conversations
+                SET message_count = message_count - 1,
+                    last_message_at = (
+                        SELECT max(created_at) FROM messages WHERE conversation_id = OLD.conversation_id
+                    )
+                WHERE id = OLD.conversation_id;
+            END IF;
+            RETURN NULL;
+        END;
+        $$ LANGUAGE plpgsql
+    """)
+    op.execute("""
+        CREATE TRIGGER messages_conversation_stats
+        AFTER INSERT OR DELETE ON messages
+        FOR EACH ROW EXECUTE FUNCTION update_conversation_message_stats()
+    """)
+
+def downgrade() -> None:
+    op.execute("DROP TRIGGER IF EXISTS messages_conversation_stats ON messages")
+    op.execute("DROP FUNCTION IF EXISTS update_conversation_message_stats()")
+
+    op.drop_column('conversations', 'last_message_at')
+    op.drop_column('conversations', 'message_count')
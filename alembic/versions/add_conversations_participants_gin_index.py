@@ -0,0 +1,22 @@
+"""Add GIN index on conversations.participants
+
+Revision ID: add_conversations_participants_gin_index
+Revises: add_summaries_embedding
+Create Date: 2024-04-10 12:00:00.000000
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+# revision identifiers, used by Alembic.
+revision = 'add_conversations_participants_gin_index'
+down_revision = 'add_summaries_embedding'
+branch_labels = None
+depends_on = None
+
+def upgrade() -> None:
+    # Serves participants @> ARRAY[...] containment lookups
+    op.create_index('ix_conversations_participants_gin', 'conversations', ['participants'], unique=False, postgresql_using='gin')
+
+def downgrade() -> None:
+    op.drop_index('ix_conversations_participants_gin', table_name='conversations')
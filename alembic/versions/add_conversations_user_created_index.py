@@ -0,0 +1,29 @@
+"""Replace user_id index with a composite (user_id, created_at DESC, id DESC) index
+
+Revision ID: add_conversations_user_created_index
+Revises: add_conversation_message_stats
+Create Date: 2024-04-03 12:00:00.000000
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+# revision identifiers, used by Alembic.
+revision = 'add_conversations_user_created_index'
+down_revision = 'add_conversation_message_stats'
+branch_labels = None
+depends_on = None
+
+def upgrade() -> None:
+    # Matches the user chat list: WHERE user_id = ... ORDER BY created_at DESC, id DESC
+    op.create_index(
+        'ix_conversations_user_created',
+        'conversations',
+        ['user_id', sa.text('created_at DESC'), sa.text('id DESC')],
+        unique=False,
+    )
+    op.drop_index(op.f('ix_conversations_user_id'), table_name='conversations')
+
+def downgrade() -> None:
+    op.create_index(op.f('ix_conversations_user_id'), 'conversations', ['user_id'], unique=False)
+    op.drop_index('ix_conversations_user_created', table_name='conversations')
@@ -0,0 +1,23 @@
+"""Add prompt embedding to summaries for semantic cache lookups
+
+Revision ID: add_summaries_embedding
+Revises: add_summaries_table
+Create Date: 2024-04-08 12:00:00.000000
+
+"""
+from alembic import op
+import sqlalchemy as sa
+from pgvector.sqlalchemy import Vector
+
+# revision identifiers, used by Alembic.
+revision = 'add_summaries_embedding'
+down_revision = 'add_summaries_table'
+branch_labels = None
+depends_on = None
+
+def upgrade() -> None:
+    op.execute("CREATE EXTENSION IF NOT EXISTS vector")
+    op.add_column('summaries', sa.Column('embedding', Vector(768), nullable=True))
+
+def downgrade() -> None:
+    op.drop_column('summaries', 'embedding')
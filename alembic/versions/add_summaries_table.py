@@ -0,0 +1,33 @@
+"""Add summaries table for caching generated summaries
+
+Revision ID: add_summaries_table
+Revises: add_conversations_user_created_index
+Create Date: 2024-04-05 12:00:00.000000
+
+"""
+from alembic import op
+import sqlalchemy as sa
+from sqlalchemy.dialects import postgresql
+
+# revision identifiers, used by Alembic.
+revision = 'add_summaries_table'
+down_revision = 'add_conversations_user_created_index'
+branch_labels = None
+depends_on = None
+
+def upgrade() -> None:
+    # One cached summary per conversation, valid while content_hash matches
+    op.create_table(
+        'summaries',
+        sa.Column('conversation_id', postgresql.UUID(as_uuid=True), nullable=False),
+        sa.Column('content_hash', sa.String(length=32), nullable=False),
+        sa.Column('summary', sa.Text(), nullable=False),
+        sa.Column('key_points', postgresql.ARRAY(sa.Text()), nullable=False),
+        sa.Column('action_items', postgresql.ARRAY(sa.Text()), nullable=False),
+        sa.Column('created_at', sa.DateTime(timezone=True), server_default=sa.text('now()'), nullable=True),
+        sa.ForeignKeyConstraint(['conversation_id'], ['conversations.id'], ondelete='CASCADE'),
+        sa.PrimaryKeyConstraint('conversation_id')
+    )
+
+def downgrade() -> None:
+    op.drop_table('summaries')
@@ -1,20 +1,90 @@
 from fastapi import APIRouter, Depends, HTTPException, Query
+from fastapi.responses import ORJSONResponse, StreamingResponse
+from pydantic import TypeAdapter
 from sqlalchemy.ext.asyncio import AsyncSession
-from sqlalchemy import select, desc, and_
-from typing import List, Optional
+from sqlalchemy import select, insert, delete, desc, and_, tuple_
+from sqlalchemy.exc import IntegrityError
+from typing import AsyncIterator, List, Optional, Tuple
 from uuid import UUID
 from datetime import datetime
+import base64
 import logging
-from sqlalchemy.orm import selectinload
+import asyncpg
+from sqlalchemy.orm import raiseload, load_only
+from sqlalchemy.orm.attributes import set_committed_value
 
-from ...db.session import get_db
+from ...db.session import get_db, get_postgres_pool, AsyncSessionLocal
 from ...models.chat import Conversation, Message
-from ...schemas.chat import ConversationCreate, Conversation as ConversationSchema, MessageCreate, ChatSummary
-from ...services.gemini import generate_summary
+from ...schemas.chat import ConversationCreate, Conversation as ConversationSchema, ConversationSummary, ConversationPage, Message as MessageSchema, MessageCreate, ChatSummary
+from ...services.gemini import build_summary_prompt, embed_prompt, generate_summary_stream, parse_summary
+from ...services.summary_cache import build_summary_key, get_cached_summary, summary_payload, find_similar_summary, store_summary
 
 router = APIRouter()
 logger = logging.getLogger(__name__)
 
+# Hot single-conversation read, run through asyncpg's prepared statement cache
+CONVERSATION_BY_ID_SQL = (
+    "SELECT id::text AS id, user_id, created_at, participants, title "
+    "FROM conversations WHERE id = $1"
+)
+MESSAGES_BY_CONVERSATION_SQL = (
+    "SELECT id::text AS id, conversation_id::text AS conversation_id, content, sender, created_at "
+    "FROM messages WHERE conversation_id = $1 ORDER BY created_at"
+)
+
+# Validates and serializes a whole page in one pass instead of model by model
+conversation_summaries = TypeAdapter(List[ConversationSummary])
+
+def _is_foreign_key_violation(error: IntegrityError) -> bool:
+    # SQLAlchemy wraps the driver error; the asyncpg exception is chained as __cause__
+    return isinstance(error.orig.__cause__, asyncpg.exceptions.ForeignKeyViolationError)
+
+def _sse(data: str, event: Optional[str] = None) -> str:
+    """Format a server-sent event; multi-line data needs one data field per line."""
+    lines = [f"event: {event}"] if event else []
+    lines.extend(f"data: {line}" for line in data.split("\n"))
+    return "\n".join(lines) + "\n\n"
+
+def _done_event(summary: dict) -> str:
+    """Terminal `done` event carrying the parsed summary, for cached and live streams alike."""
+    return _sse(ChatSummary(**summary).model_dump_json(), event="done")
+
+async def _embed_for_cache(conversation_id: UUID, prompt: str) -> Optional[List[float]]:
+    """Embedding for the semantic cache, or None if it cannot be computed."""
+    try:
+        return await embed_prompt(prompt)
+    except Exception as e:
+        logger.warning(f"Skipping semantic cache for conversation {conversation_id}: {str(e)}")
+        return None
+
+async def _stream_summary(
+    conversation_id: UUID, key: str, prompt: str, embedding: Optional[List[float]]
+) -> AsyncIterator[str]:
+    """Relay Gemini's output as it arrives, then send the parsed summary as a `done` event."""
+    chunks = []
+    try:
+        async for text in generate_summary_stream(prompt):
+            chunks.append(text)
+            yield _sse(text)
+        summary = parse_summary("".join(chunks))
+    except Exception as e:
+        logger.error(f"Error streaming summary for conversation {conversation_id}: {str(e)}")
+        yield _sse(f"Failed to generate summary: {str(e)}", event="error")
+        return
+    yield _done_event(summary)
+    
+    # Caching happens after done, and a failure here must not fail the summary.
+    # Embed now so a first summary does not wait on it.
+    if embedding is None:
+        embedding = await _embed_for_cache(conversation_id, prompt)
+    try:
+        # The request session is closed once streaming starts, so cache with a fresh one
+        async with AsyncSessionLocal() as db:
+            await store_summary(db, conversation_id, key, summary, embedding)
+            await db.commit()
+    except Exception as e:
+        logger.warning(f"Failed to cache summary for conversation {conversation_id}: {str(e)}")
+
 @router.post("/chats", response_model=ConversationSchema)
 async def create_conversation(
     conversation: ConversationCreate,
@@ -26,13 +96,8 @@ async def create_conversation(
         await db.commit()
         await db.refresh(db_conversation)
         
-        # Load the messages relationship
-        result = await db.execute(
-            select(Conversation)
-            .options(selectinload(Conversation.messages))
-            .where(Conversation.id == db_conversation.id)
-        )
-        db_conversation = result.scalar_one()
+        # A new conversation has no messages, so there is nothing to load
+        set_committed_value(db_conversation, "messages", [])
         
         return db_conversation
     except Exception as e:
@@ -43,120 +108,196 @@ async def create_conversation(
 @router.get("/chats/{conversation_id}", response_model=ConversationSchema)
 async def get_conversation(
     conversation_id: UUID,
-    db: AsyncSession = Depends(get_db)
+    pool: asyncpg.Pool = Depends(get_postgres_pool)
 ):
     try:
-        result = await db.execute(
-            select(Conversation)
-            .options(selectinload(Conversation.messages))
-            .where(Conversation.id == conversation_id)
-        )
-        conversation = result.scalar_one_or_none()
-        if not conversation:
-            raise HTTPException(status_code=404, detail="Conversation not found")
-        return conversation
+        async with pool.acquire() as conn:
+            row = await conn.fetchrow(CONVERSATION_BY_ID_SQL, conversation_id)
+            if row is None:
+                raise HTTPException(status_code=404, detail="Conversation not found")
+            messages = await conn.fetch(MESSAGES_BY_CONVERSATION_SQL, conversation_id)
+        return ConversationSchema(**dict(row), messages=[dict(message) for message in messages])
+    except HTTPException:
+        raise
     except Exception as e:
         logger.error(f"Error retrieving conversation {conversation_id}: {str(e)}")
         raise HTTPException(status_code=500, detail=f"Failed to retrieve conversation: {str(e)}")
 
-@router.get("/users/{user_id}/chats", response_model=List[ConversationSchema])
+def _encode_cursor(conversation: Conversation) -> str:
+    """Opaque, URL-safe page cursor for the last conversation returned."""
+    raw = f"{conversation.created_at.isoformat()}|{conversation.id}".encode()
+    return base64.urlsafe_b64encode(raw).decode().rstrip("=")
+
+def _decode_cursor(cursor: Optional[str]) -> Optional[Tuple[datetime, str]]:
+    if not cursor:
+        return None
+    try:
+        raw = base64.urlsafe_b64decode(cursor + "=" * (-len(cursor) % 4)).decode()
+        created_at, conversation_id = raw.split("|")
+        return datetime.fromisoformat(created_at), str(UUID(conversation_id))
+    except ValueError:
+        raise HTTPException(status_code=400, detail="Invalid cursor")
+
+def _paginate(query, cursor: Optional[Tuple[datetime, str]], limit: int):
+    """Apply keyset pagination on (created_at, id) to a conversation query."""
+    # Keyset pagination: seek past the previous page instead of OFFSET; id breaks
+    # created_at ties so rows are not skipped at page boundaries. Compare against a
+    # plain tuple so the binds take the column types (the id must bind as UUID).
+    if cursor:
+        query = query.where(tuple_(Conversation.created_at, Conversation.id) < cursor)
+    
+    return query.order_by(desc(Conversation.created_at), desc(Conversation.id)).limit(limit)
+
+async def _conversation_page(
+    db: AsyncSession, query, cursor: Optional[Tuple[datetime, str]], limit: int
+) -> ORJSONResponse:
+    """Run a conversation list query with keyset pagination on (created_at, id)."""
+    result = await db.execute(_paginate(query, cursor, limit))
+    conversations = result.scalars().all()
+    next_cursor = _encode_cursor(conversations[-1]) if len(conversations) == limit else None
+    items = conversation_summaries.validate_python(conversations, from_attributes=True)
+    return ORJSONResponse({
+        "items": conversation_summaries.dump_python(items),
+        "next_cursor": next_cursor
+    })
+
+@router.get("/users/{user_id}/chats", response_model=ConversationPage)
 async def get_user_chats(
     user_id: str,
-    skip: int = Query(0, ge=0),
+    before: Optional[str] = Query(None, description="Cursor: next_cursor from the previous page"),
     limit: int = Query(10, ge=1, le=100),
     start_date: Optional[datetime] = None,
     end_date: Optional[datetime] = None,
     db: AsyncSession = Depends(get_db)
 ):
+    cursor = _decode_cursor(before)
     try:
-        query = select(Conversation).options(selectinload(Conversation.messages)).where(Conversation.user_id == user_id)
+        query = select(Conversation).options(raiseload('*')).where(Conversation.user_id == user_id)
         
         if start_date:
             query = query.where(Conversation.created_at >= start_date)
         if end_date:
             query = query.where(Conversation.created_at <= end_date)
         
-        query = query.order_by(desc(Conversation.created_at)).offset(skip).limit(limit)
-        result = await db.execute(query)
-        return result.scalars().all()
+        return await _conversation_page(db, query, cursor, limit)
     except Exception as e:
         logger.error(f"Error retrieving chats for user {user_id}: {str(e)}")
         raise HTTPException(status_code=500, detail=f"Failed to retrieve user chats: {str(e)}")
 
+@router.get("/participants/{participant}/chats", response_model=ConversationPage)
+async def get_participant_chats(
+    participant: str,
+    before: Optional[str] = Query(None, description="Cursor: next_cursor from the previous page"),
+    limit: int = Query(10, ge=1, le=100),
+    db: AsyncSession = Depends(get_db)
+):
+    cursor = _decode_cursor(before)
+    try:
+        # participants @> ARRAY[...] can use the GIN index; = ANY(participants) cannot
+        query = (
+            select(Conversation)
+            .options(raiseload('*'))
+            .where(Conversation.participants.contains([participant]))
+        )
+        return await _conversation_page(db, query, cursor, limit)
+    except Exception as e:
+        logger.error(f"Error retrieving chats for participant {participant}: {str(e)}")
+        raise HTTPException(status_code=500, detail=f"Failed to retrieve participant chats: {str(e)}")
+
 @router.delete("/chats/{conversation_id}")
 async def delete_conversation(
     conversation_id: UUID,
     db: AsyncSession = Depends(get_db)
 ):
     try:
+        # Messages are removed by the ON DELETE CASCADE foreign key
         result = await db.execute(
-            select(Conversation).where(Conversation.id == conversation_id)
+            delete(Conversation).where(Conversation.id == conversation_id)
         )
-        conversation = result.scalar_one_or_none()
-        if not conversation:
+        if result.rowcount == 0:
             raise HTTPException(status_code=404, detail="Conversation not found")
         
-        await db.delete(conversation)
         await db.commit()
         return {"message": "Conversation deleted successfully"}
+    except HTTPException:
+        raise
     except Exception as e:
         logger.error(f"Error deleting conversation {conversation_id}: {str(e)}")
         await db.rollback()
         raise HTTPException(status_code=500, detail=f"Failed to delete conversation: {str(e)}")
 
-@router.post("/chats/{conversation_id}/messages", response_model=ConversationSchema)
+@router.post("/chats/{conversation_id}/messages", response_model=MessageSchema)
 async def add_message(
     conversation_id: UUID,
     message: MessageCreate,
     db: AsyncSession = Depends(get_db)
 ):
     try:
+        # Insert and read back the generated columns in one statement; the
+        # messages foreign key doubles as the conversation existence check
+        values = message.model_dump()
         result = await db.execute(
-            select(Conversation)
-            .options(selectinload(Conversation.messages))
-            .where(Conversation.id == conversation_id)
+            insert(Message)
+            .values(conversation_id=conversation_id, **values)
+            .returning(Message.id, Message.conversation_id, Message.created_at)
         )
-        conversation = result.scalar_one_or_none()
-        if not conversation:
-            raise HTTPException(status_code=404, detail="Conversation not found")
-        
-        db_message = Message(
-            conversation_id=conversation_id,
-            **message.model_dump()
-        )
-        db.add(db_message)
+        row = result.one()
         await db.commit()
         
-        # Reload the conversation with messages
-        result = await db.execute(
-            select(Conversation)
-            .options(selectinload(Conversation.messages))
-            .where(Conversation.id == conversation_id)
-        )
-        conversation = result.scalar_one()
-        
-        return conversation
+        return {**values, **row._mapping}
+    except IntegrityError as e:
+        await db.rollback()
+        if _is_foreign_key_violation(e):
+            raise HTTPException(status_code=404, detail="Conversation not found")
+        logger.error(f"Error adding message to conversation {conversation_id}: {str(e)}")
+        raise HTTPException(status_code=500, detail=f"Failed to add message: {str(e)}")
     except Exception as e:
         logger.error(f"Error adding message to conversation {conversation_id}: {str(e)}")
         await db.rollback()
         raise HTTPException(status_code=500, detail=f"Failed to add message: {str(e)}")
 
-@router.post("/chats/{conversation_id}/summarize", response_model=ChatSummary)
+@router.post("/chats/{conversation_id}/summarize", response_class=StreamingResponse)
 async def summarize_conversation(
     conversation_id: UUID,
     db: AsyncSession = Depends(get_db)
 ):
     try:
-        result = await db.execute(
-            select(Conversation)
-            .options(selectinload(Conversation.messages))
-            .where(Conversation.id == conversation_id)
-        )
-        conversation = result.scalar_one_or_none()
+        conversation = await db.get(Conversation, conversation_id, options=[raiseload('*')])
         if not conversation:
             raise HTTPException(status_code=404, detail="Conversation not found")
         
-        return await generate_summary(conversation.messages, conversation.participants)
+        # Serve the cached summary while the conversation is unchanged
+        key = build_summary_key(conversation_id, conversation.last_message_at, conversation.message_count)
+        cached = await get_cached_summary(db, conversation_id)
+        if cached is not None and cached.content_hash == key:
+            return StreamingResponse([_done_event(summary_payload(cached))], media_type="text/event-stream")
+        
+        # The prompt only needs these columns; skip the rest of each row
+        result = await db.execute(
+            select(Message)
+            .options(load_only(Message.content, Message.sender, Message.created_at))
+            .where(Message.conversation_id == conversation_id)
+            .order_by(Message.created_at)
+        )
+        prompt = build_summary_prompt(result.scalars().all(), conversation.participants)
+        
+        # Near-identical content (e.g. one trivial new message) reuses the last
+        # summary; without an earlier summary there is nothing to compare against
+        embedding = None
+        if cached is not None:
+            embedding = await _embed_for_cache(conversation_id, prompt)
+        if embedding is not None:
+            similar = await find_similar_summary(db, conversation_id, key, embedding)
+            if similar:
+                await db.commit()
+                return StreamingResponse([_done_event(similar)], media_type="text/event-stream")
+        
+        return StreamingResponse(
+            _stream_summary(conversation_id, key, prompt, embedding),
+            media_type="text/event-stream"
+        )
+    except HTTPException:
+        raise
     except Exception as e:
         logger.error(f"Error summarizing conversation {conversation_id}: {str(e)}")
-        raise HTTPException(status_code=500, detail=f"Failed to generate summary: {str(e)}") 
\ No newline at end of file
+        raise HTTPException(status_code=500, detail=f"Failed to generate summary: {str(e)}")
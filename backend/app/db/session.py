@@ -1,11 +1,37 @@
+from uuid import uuid4
+import asyncpg
+from fastapi import Request
 from sqlalchemy.ext.asyncio import create_async_engine, AsyncSession
 from sqlalchemy.orm import sessionmaker
 from ..core.config import settings
 
+def _async_url(url: str) -> str:
+    """Make sure the URL uses the asyncpg driver."""
+    if url.startswith("postgresql://"):
+        return url.replace("postgresql://", "postgresql+asyncpg://", 1)
+    return url
+
+# PgBouncer in transaction mode cannot keep prepared statements across transactions,
+# and the adapter's default __asyncpg_stmt_N__ names collide between clients that
+# share a server connection, so give every statement a unique name
+connect_args = (
+    {
+        "statement_cache_size": 0,
+        "prepared_statement_cache_size": 0,
+        "prepared_statement_name_func": lambda: f"__asyncpg_{uuid4()}__",
+    }
+    if settings.PGBOUNCER_URL
+    else {}
+)
+
 engine = create_async_engine(
-    settings.DATABASE_URL,
+    _async_url(settings.PGBOUNCER_URL or settings.DATABASE_URL),
+    pool_size=settings.DB_POOL_SIZE,
+    max_overflow=settings.DB_MAX_OVERFLOW,
+    pool_timeout=settings.DB_POOL_TIMEOUT,
     pool_pre_ping=True,
-    echo=True
+    echo=False,
+    connect_args=connect_args,
 )
 
 AsyncSessionLocal = sessionmaker(
@@ -17,4 +43,18 @@ async def get_db():
         try:
             yield session
         finally:
-            await session.close()
\ No newline at end of file
+            await session.close()
+
+async def create_postgres_pool() -> asyncpg.Pool:
+    """Raw asyncpg pool for hot read paths that skip the ORM."""
+    url = settings.PGBOUNCER_URL or settings.DATABASE_URL
+    return await asyncpg.create_pool(
+        url.replace("postgresql+asyncpg://", "postgresql://", 1),
+        min_size=settings.DB_RAW_POOL_MIN,
+        max_size=settings.DB_RAW_POOL_MAX,
+        # asyncpg caches prepared statements per connection unless behind PgBouncer
+        statement_cache_size=0 if settings.PGBOUNCER_URL else 100,
+    )
+
+async def get_postgres_pool(request: Request) -> asyncpg.Pool:
+    return request.app.state.postgres_pool
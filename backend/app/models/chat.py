@@ -1,28 +1,53 @@
-from sqlalchemy import Column, String, DateTime, ForeignKey, Text, ARRAY
-from sqlalchemy.dialects.postgresql import UUID
+from sqlalchemy import Column, String, DateTime, ForeignKey, Index, Integer, Text
+# PostgreSQL ARRAY supports contains() (@>), which the generic type does not
+from sqlalchemy.dialects.postgresql import UUID, ARRAY
 from sqlalchemy.sql import func
-from sqlalchemy.orm import relationship
+from sqlalchemy.orm import relationship, deferred
+from pgvector.sqlalchemy import Vector
 from uuid import uuid4
 from ..db.base_class import Base
 
+# UUID columns use as_uuid=False so ids stay plain strings end to end,
+# avoiding uuid.UUID construction and re-serialization on every row
 class Conversation(Base):
     __tablename__ = "conversations"
 
-    id = Column(UUID(as_uuid=True), primary_key=True, default=uuid4)
-    user_id = Column(String(255), nullable=False, index=True)
+    id = Column(UUID(as_uuid=False), primary_key=True, default=lambda: str(uuid4()))
+    user_id = Column(String(255), nullable=False)
     created_at = Column(DateTime(timezone=True), server_default=func.now())
     participants = Column(ARRAY(Text))
     title = Column(String(255))
+    # Maintained by the messages_conversation_stats trigger
+    message_count = Column(Integer, nullable=False, server_default="0")
+    last_message_at = Column(DateTime(timezone=True))
 
     messages = relationship("Message", back_populates="conversation", cascade="all, delete-orphan")
 
+    __table_args__ = (
+        Index("ix_conversations_user_created", user_id, created_at.desc(), id.desc()),
+        Index("ix_conversations_participants_gin", participants, postgresql_using="gin"),
+    )
+
 class Message(Base):
     __tablename__ = "messages"
 
-    id = Column(UUID(as_uuid=True), primary_key=True, default=uuid4)
-    conversation_id = Column(UUID(as_uuid=True), ForeignKey("conversations.id", ondelete="CASCADE"), index=True)
+    id = Column(UUID(as_uuid=False), primary_key=True, default=lambda: str(uuid4()))
+    conversation_id = Column(UUID(as_uuid=False), ForeignKey("conversations.id", ondelete="CASCADE"), index=True)
     content = Column(Text, nullable=False)
     sender = Column(String(255), nullable=False)
     created_at = Column(DateTime(timezone=True), server_default=func.now())
 
-    conversation = relationship("Conversation", back_populates="messages") 
\ No newline at end of file
+    conversation = relationship("Conversation", back_populates="messages")
+
+class Summary(Base):
+    """Last generated summary of a conversation, keyed by a hash of its content."""
+    __tablename__ = "summaries"
+
+    conversation_id = Column(UUID(as_uuid=False), ForeignKey("conversations.id", ondelete="CASCADE"), primary_key=True)
+    content_hash = Column(String(32), nullable=False)
+    summary = Column(Text, nullable=False)
+    key_points = Column(ARRAY(Text), nullable=False)
+    action_items = Column(ARRAY(Text), nullable=False)
+    # Embedding of the prompt that produced this summary; only compared in SQL
+    embedding = deferred(Column(Vector(768)))
+    created_at = Column(DateTime(timezone=True), server_default=func.now())
@@ -1,4 +1,4 @@
-from pydantic import BaseModel, UUID4, Field
+from pydantic import BaseModel, ConfigDict, Field
 from typing import List, Optional
 from datetime import datetime
 
@@ -10,12 +10,11 @@ class MessageCreate(MessageBase):
     pass
 
 class Message(MessageBase):
-    id: UUID4
-    conversation_id: UUID4
+    id: str
+    conversation_id: str
     created_at: datetime
 
-    class Config:
-        from_attributes = True
+    model_config = ConfigDict(from_attributes=True, defer_build=True)
 
 class ConversationBase(BaseModel):
     user_id: str
@@ -26,16 +25,25 @@ class ConversationCreate(ConversationBase):
     pass
 
 class Conversation(ConversationBase):
-    id: UUID4
+    id: str
     created_at: datetime
     messages: List[Message] = Field(default_factory=list)
 
-    class Config:
-        from_attributes = True
-        json_encoders = {
-            datetime: lambda v: v.isoformat(),
-            UUID4: lambda v: str(v)
-        }
+    model_config = ConfigDict(from_attributes=True, defer_build=True)
+
+class ConversationSummary(ConversationBase):
+    """Conversation without its messages, used for list views."""
+    id: str
+    created_at: datetime
+    message_count: int = 0
+    last_message_at: Optional[datetime] = None
+
+    model_config = ConfigDict(from_attributes=True, defer_build=True)
+
+class ConversationPage(BaseModel):
+    """A page of conversations; pass next_cursor as `before` to fetch the next one."""
+    items: List[ConversationSummary]
+    next_cursor: Optional[str] = None
 
 class ChatSummary(BaseModel):
     summary: str
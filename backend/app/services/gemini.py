@@ -1,34 +1,61 @@
+import asyncio
+import re
+from typing import AsyncIterator
 import google.generativeai as genai
 from ..core.config import settings
 from ..schemas.chat import Message
 
 genai.configure(api_key=settings.GEMINI_API_KEY)
 model = genai.GenerativeModel('gemini-1.5-pro-latest')
+EMBEDDING_MODEL = 'models/embedding-001'  # 768 dimensions
+# embedding-001 accepts about 2048 input tokens; ~4 characters per token
+EMBEDDING_MAX_CHARS = 8000
 
-async def generate_summary(messages: list[Message], participants: list[str]) -> dict:
-    # Create the conversation text
-    conversation_text = "\n".join([f"{msg.sender}: {msg.content}" for msg in messages])
-    
-    prompt = f"""Analyze this conversation between {', '.join(participants)}:
+PROMPT_TEMPLATE = """Analyze this conversation between {participants}:
 
-{conversation_text}
+{conversation}
 
 Provide:
 1. A concise 3-sentence summary of the conversation
 2. Key discussion points (as a list)
 3. Action items (if any, as a list)"""
-    
-    response = await model.generate_content_async(prompt)
-    content = response.text
-    
-    # Parse the response into structured format
-    sections = content.split('\n\n')
-    summary = sections[0].strip()
-    key_points = [point.strip('- ') for point in sections[1].split('\n')[1:] if point.strip()]
-    action_items = [item.strip('- ') for item in sections[2].split('\n')[1:] if item.strip()]
+
+# Matches "- item" / "* item" bullet lines (optionally indented), capturing the
+# item text; the whitespace after the marker keeps "**Header:**" lines out
+BULLET_RE = re.compile(r'^\s*[-*]\s+(.+)$', re.M)
+
+def build_summary_prompt(messages: list[Message], participants: list[str]) -> str:
+    return PROMPT_TEMPLATE.format(
+        participants=', '.join(participants),
+        conversation="\n".join(f"{msg.sender}: {msg.content}" for msg in messages),
+    )
+
+async def embed_prompt(prompt: str) -> list[float]:
+    # Embed the most recent part of long conversations so they stay under the
+    # input limit while newly added messages still change the embedding
+    content = prompt[-EMBEDDING_MAX_CHARS:]
+    # The SDK only exposes a blocking embed call, keep it off the event loop
+    result = await asyncio.to_thread(
+        genai.embed_content,
+        model=EMBEDDING_MODEL,
+        content=content,
+        task_type="semantic_similarity",
+    )
+    return result["embedding"]
+
+async def generate_summary_stream(prompt: str) -> AsyncIterator[str]:
+    """Yield the summary text as Gemini produces it."""
+    response = await model.generate_content_async(prompt, stream=True)
+    async for chunk in response:
+        yield chunk.text
+
+def parse_summary(content: str) -> dict:
+    # Parse the response into structured format: summary, key points, action items
+    summary, _, rest = content.partition('\n\n')
+    key_points_section, _, action_items_section = rest.partition('\n\n')
     
     return {
-        "summary": summary,
-        "key_points": key_points,
-        "action_items": action_items
-    } 
\ No newline at end of file
+        "summary": summary.strip(),
+        "key_points": [point.strip() for point in BULLET_RE.findall(key_points_section)],
+        "action_items": [item.strip() for item in BULLET_RE.findall(action_items_section)]
+    }
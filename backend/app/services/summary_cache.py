@@ -0,0 +1,71 @@
+from datetime import datetime
+from hashlib import blake2b
+from typing import List, Optional
+from uuid import UUID
+from sqlalchemy import select, update
+from sqlalchemy.dialects.postgresql import insert
+from sqlalchemy.ext.asyncio import AsyncSession
+from ..core.config import settings
+from ..models.chat import Summary
+
+def build_summary_key(conversation_id: UUID, last_message_at: Optional[datetime], message_count: int) -> str:
+    """Hash the conversation state; any added or removed message changes the key."""
+    key = blake2b(conversation_id.bytes, digest_size=16)
+    key.update(last_message_at.isoformat().encode() if last_message_at else b"")
+    key.update(str(message_count).encode())
+    return key.hexdigest()
+
+async def get_cached_summary(db: AsyncSession, conversation_id: UUID) -> Optional[Summary]:
+    """Last cached summary of the conversation, current or not; compare content_hash."""
+    return await db.get(Summary, conversation_id)
+
+def summary_payload(cached: Summary) -> dict:
+    return {
+        "summary": cached.summary,
+        "key_points": cached.key_points,
+        "action_items": cached.action_items
+    }
+
+async def find_similar_summary(
+    db: AsyncSession, conversation_id: UUID, key: str, embedding: List[float]
+) -> Optional[dict]:
+    """Reuse the cached summary if its prompt embedding is close enough to the new one.
+
+    On a hit the row is re-keyed to the current state but keeps its original
+    embedding, so a run of small edits cannot drift away from the content that
+    was actually summarized.
+    """
+    result = await db.execute(
+        select(Summary.summary, Summary.key_points, Summary.action_items)
+        .where(
+            Summary.conversation_id == conversation_id,
+            Summary.embedding.cosine_distance(embedding) < settings.SEMANTIC_CACHE_MAX_DISTANCE
+        )
+    )
+    row = result.one_or_none()
+    if row is None:
+        return None
+    await db.execute(
+        update(Summary)
+        .where(Summary.conversation_id == conversation_id)
+        .values(content_hash=key)
+    )
+    return dict(row._mapping)
+
+async def store_summary(
+    db: AsyncSession, conversation_id: UUID, key: str, summary: dict, embedding: Optional[List[float]] = None
+) -> None:
+    """Upsert the summary, replacing whatever was cached for an older state."""
+    stmt = insert(Summary).values(conversation_id=conversation_id, content_hash=key, embedding=embedding, **summary)
+    stmt = stmt.on_conflict_do_update(
+        index_elements=[Summary.conversation_id],
+        set_={
+            "content_hash": stmt.excluded.content_hash,
+            "summary": stmt.excluded.summary,
+            "key_points": stmt.excluded.key_points,
+            "action_items": stmt.excluded.action_items,
+            "embedding": stmt.excluded.embedding,
+            "created_at": stmt.excluded.created_at,
+        }
+    )
+    await db.execute(stmt)
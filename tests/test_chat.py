@@ -0,0 +1,43 @@
+from datetime import datetime, timezone
+from types import SimpleNamespace
+
+import pytest
+from fastapi import HTTPException
+from sqlalchemy import select
+from sqlalchemy.dialects.postgresql import UUID
+from sqlalchemy.dialects.postgresql.asyncpg import dialect as asyncpg_dialect
+
+from backend.app.api.endpoints.chat import _decode_cursor, _encode_cursor, _paginate
+from backend.app.models.chat import Conversation
+
+CONVERSATION_ID = "6f1b6c1e-8a53-4d8e-9d0a-0a4b3f7c9e21"
+CREATED_AT = datetime(2024, 1, 2, 3, 4, 5, 123456, tzinfo=timezone.utc)
+
+
+def test_cursor_round_trip():
+    cursor = _encode_cursor(SimpleNamespace(created_at=CREATED_AT, id=CONVERSATION_ID))
+
+    assert "=" not in cursor and "+" not in cursor
+    assert _decode_cursor(cursor) == (CREATED_AT, CONVERSATION_ID)
+
+
+@pytest.mark.parametrize("cursor", ["garbage!", "bm90IGEgY3Vyc29y", "MjAyNC0wMS0wMnxub3QtYS11dWlk"])
+def test_decode_cursor_rejects_malformed_values(cursor):
+    with pytest.raises(HTTPException) as exc_info:
+        _decode_cursor(cursor)
+
+    assert exc_info.value.status_code == 400
+
+
+def test_decode_cursor_without_value():
+    assert _decode_cursor(None) is None
+
+
+def test_paginate_binds_cursor_id_as_uuid():
+    query = _paginate(select(Conversation), (CREATED_AT, CONVERSATION_ID), 10)
+    compiled = query.compile(dialect=asyncpg_dialect())
+
+    assert "(conversations.created_at, conversations.id) < (" in str(compiled)
+    assert "::UUID)" in str(compiled)
+    id_binds = [bind for bind in compiled.binds.values() if bind.value == CONVERSATION_ID]
+    assert id_binds and all(isinstance(bind.type, UUID) for bind in id_binds)
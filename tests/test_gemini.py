@@ -0,0 +1,37 @@
+from backend.app.services.gemini import parse_summary
+
+
+def test_parse_summary_skips_bold_headers():
+    content = (
+        "**Summary:** They agreed on the release plan.\n\n"
+        "**Key Discussion Points:**\n* one\n* two\n\n"
+        "**Action Items:**\n- x"
+    )
+
+    result = parse_summary(content)
+
+    assert result["summary"] == "**Summary:** They agreed on the release plan."
+    assert result["key_points"] == ["one", "two"]
+    assert result["action_items"] == ["x"]
+
+
+def test_parse_summary_accepts_indented_and_mixed_bullets():
+    content = "Summary.\n\nKey points:\n  - first\n  * second\n\nAction items:\n-   do it"
+
+    result = parse_summary(content)
+
+    assert result["key_points"] == ["first", "second"]
+    assert result["action_items"] == ["do it"]
+
+
+def test_parse_summary_with_fewer_than_three_sections():
+    assert parse_summary("Just a summary.") == {
+        "summary": "Just a summary.",
+        "key_points": [],
+        "action_items": [],
+    }
+    assert parse_summary("Summary.\n\nKey points:\n- only") == {
+        "summary": "Summary.",
+        "key_points": ["only"],
+        "action_items": [],
+    }